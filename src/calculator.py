@@ -3,12 +3,130 @@
 """
 
 import math
-from typing import Any, Dict, List, Optional, Union
+from array import array
+import operator
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
 from constants import (
-    ERROR_MESSAGES
+    CODEGEN_MAX_DEPTH,
+    CODEGEN_MIN_EVALUATIONS,
+    ERROR_MESSAGES,
+    INT_OPCODES,
+    OP_ADD,
+    OP_CALL,
+    OP_DIV,
+    OP_FLOORDIV_CHECKED,
+    OP_FLOORDIV_INT,
+    OP_LOAD_VAR,
+    OP_MOD_CHECKED,
+    OP_MOD_INT,
+    OP_MUL,
+    OP_NEG,
+    OP_POW,
+    OP_PUSH_CONST,
+    OP_STORE_VAR,
+    OP_SUB,
+    OPERATOR_OPCODES,
+    OPERATOR_PRECEDENCE,
+    PROGRAM_CACHE_SIZE,
+    PURE_OPCODES,
+    RIGHT_ASSOCIATIVE_OPERATORS,
+    TK_ASSIGN,
+    TK_COMMA,
+    TK_IDENT,
+    TK_LPAREN,
+    TK_NUM,
+    TK_OP_ADD,
+    TK_OP_POW,
+    TK_OP_SUB,
+    TK_RPAREN,
+    UNASSIGNED_SLOTS_LIMIT
 )
 
-from tokenizer import Tokenizer
+from tokenizer import Token, Tokenizer
+
+# Числовое значение выражения
+Number = Union[int, float]
+
+# Встроенная функция калькулятора
+Function = Callable[..., Number]
+
+# Инструкция программы: (код операции, аргумент)
+Instruction = Tuple[int, Any]
+
+# Сгенерированная функция: (значения переменных, таблица функций) -> результат
+GeneratedFunction = Callable[[List[Any], Tuple[Function, ...]], Any]
+
+# Бинарные операции, индексируемые кодом операции (OP_ADD ... OP_MOD_CHECKED)
+_BINARY_OPERATIONS: Tuple[Callable[[Any, Any], Any], ...] = (
+    operator.add, operator.sub, operator.mul, operator.truediv,
+    operator.floordiv, operator.mod, operator.pow,
+    operator.floordiv, operator.mod
+)
+
+# Сообщения для ZeroDivisionError, возбужденного бинарной операцией
+_ZERO_DIVISION_ERRORS = {
+    OP_DIV: ERROR_MESSAGES['division_by_zero'],
+    OP_FLOORDIV_INT: ERROR_MESSAGES['integer_division_by_zero'],
+    OP_MOD_INT: ERROR_MESSAGES['modulo_by_zero'],
+    OP_POW: ERROR_MESSAGES['division_by_zero'],
+    OP_FLOORDIV_CHECKED: ERROR_MESSAGES['integer_division_by_zero'],
+    OP_MOD_CHECKED: ERROR_MESSAGES['modulo_by_zero']
+}
+
+# Сообщения для // и % с нецелыми операндами
+_INTEGER_ONLY_ERRORS = {
+    OP_FLOORDIV_CHECKED: "Операция // допустима только для целых чисел",
+    OP_MOD_CHECKED: "Операция % допустима только для целых чисел"
+}
+
+# Операторы Python для бинарных операций при генерации кода
+_OPCODE_SYMBOLS = {
+    OP_ADD: '+', OP_SUB: '-', OP_MUL: '*', OP_DIV: '/',
+    OP_FLOORDIV_INT: '//', OP_MOD_INT: '%', OP_POW: '**'
+}
+
+# Токенизатор не хранит состояния, поэтому один экземпляр используется
+# всеми калькуляторами
+_SHARED_TOKENIZER = Tokenizer()
+
+# Значение слота переменной, которой еще не присвоено значение
+_UNSET: Any = object()
+
+
+class CompiledProgram:
+    """
+    Скомпилированное выражение: коды операций и их аргументы хранятся
+    в параллельных массивах.
+    """
+
+    __slots__ = ('ops', 'args', 'max_stack', 'function', 'evaluations')
+
+    def __init__(self, instructions: List[Instruction]) -> None:
+        """
+        Инициализация программы.
+
+        Args:
+            instructions: Список инструкций (код операции, аргумент)
+        """
+        self.ops = array('b', [opcode for opcode, _ in instructions])
+        self.args: List[Any] = [argument for _, argument in instructions]
+        self.function: Optional[GeneratedFunction] = None
+        # Число вычислений программы из кэша калькулятора
+        self.evaluations = 0
+
+        # Наибольшая глубина стека значений при выполнении программы
+        self.max_stack = 0
+        depth = 0
+        for opcode, argument in instructions:
+            if opcode <= OP_MOD_CHECKED:
+                depth -= 1
+            elif opcode == OP_PUSH_CONST or opcode == OP_LOAD_VAR:
+                depth += 1
+            elif opcode == OP_CALL:
+                depth += 1 - argument[1]
+            self.max_stack = max(self.max_stack, depth)
 
 
 class Calculator:
@@ -18,15 +136,27 @@ class Calculator:
 
     def __init__(self) -> None:
         """Инициализация калькулятора."""
-        self._tokenizer = Tokenizer()
-        self._variables: Dict[str, Union[int, float]] = {}
-        self._tokens: List[str] = []
-        self._current_position: int = 0
+        self._tokenizer: Tokenizer = _SHARED_TOKENIZER
+        # Переменные хранятся в слотах: в программе переменная задается
+        # индексом слота, который назначается при первой компиляции имени
+        self._variable_names: List[str] = []
+        self._variable_values: List[Any] = []
+        self._variable_index: Dict[str, int] = {}
+        # Присвоенные переменные по имени; обновляется только при присваивании
+        self._variables: Dict[str, Number] = {}
+        self._program_cache: OrderedDict[str, CompiledProgram] = OrderedDict()
 
         # Инициализация встроенных функций
-        self._functions: Dict[str, Any] = self.initialize_functions()
+        self._functions: Dict[str, Function] = self.initialize_functions()
 
-    def initialize_functions(self) -> Dict[str, Any]:
+        # Таблица функций: в программе функция задается индексом в кортеже
+        self._function_names: Tuple[str, ...] = tuple(self._functions)
+        self._function_table: Tuple[Function, ...] = tuple(self._functions.values())
+        self._function_index: Dict[str, int] = {
+            name: index for index, name in enumerate(self._function_names)
+        }
+
+    def initialize_functions(self) -> Dict[str, Function]:
         """
         Инициализирует словарь встроенных функций.
 
@@ -47,307 +177,410 @@ class Calculator:
             'exp': math.exp,
         }
 
-    def get_current_token(self) -> Optional[str]:
+    @staticmethod
+    def _unexpected_token(expected_token: str,
+                          token: Optional[Token]) -> ValueError:
         """
-        Возвращает текущий токен.
+        Создает ошибку несоответствия токена ожидаемому.
+
+        Args:
+            expected_token: Ожидаемый токен
+            token: Фактический токен или None если достигнут конец
 
         Returns:
-            Текущий токен или None если достигнут конец
+            Исключение для возбуждения
         """
-        if self._current_position < len(self._tokens):
-            return self._tokens[self._current_position]
-        return None
+        if token is None:
+            return ValueError(ERROR_MESSAGES['unexpected_end'])
+        return ValueError(f"Ожидался '{expected_token}', но получен '{token[1]}'")
 
-    def consume_token(self, expected_token: Optional[str] = None) -> str:
+    def _variable_slot(self, variable_name: str) -> int:
         """
-        Потребляет текущий токен и перемещается к следующему.
+        Возвращает индекс слота переменной, создавая слот при необходимости.
 
         Args:
-            expected_token: Ожидаемый токен (если None, проверка не выполняется)
+            variable_name: Имя переменной
 
         Returns:
-            Потребленный токен
-
-        Raises:
-            ValueError: Если достигнут конец или токен не соответствует ожидаемому
+            Индекс слота
         """
-        if self._current_position >= len(self._tokens):
-            raise ValueError(ERROR_MESSAGES['unexpected_end'])
-
-        current_token = self._tokens[self._current_position]
+        slot = self._variable_index.get(variable_name)
+        if slot is None:
+            slot = len(self._variable_names)
+            self._variable_index[variable_name] = slot
+            self._variable_names.append(variable_name)
+            self._variable_values.append(_UNSET)
+        return slot
 
-        if expected_token and current_token != expected_token:
-            raise ValueError(
-                ERROR_MESSAGES['unexpected_token'].format(
-                    expected_token, current_token
-                )
-            )
+    def _release_slots(self, slot_count: int) -> None:
+        """
+        Удаляет слоты, созданные после того, как их было slot_count.
 
-        self._current_position += 1
-        return current_token
+        Args:
+            slot_count: Число слотов, которое нужно оставить
+        """
+        for variable_name in self._variable_names[slot_count:]:
+            del self._variable_index[variable_name]
+        del self._variable_names[slot_count:]
+        del self._variable_values[slot_count:]
 
-    def parse_number(self, token: str) -> Union[int, float]:
+    def _emit_operator(self, program: List[Instruction], int_operands: List[bool],
+                       operator_token: str, argument: Any) -> None:
         """
-        Преобразует токен в число.
+        Добавляет в программу инструкцию для оператора.
 
         Args:
-            token: Токен для преобразования
+            program: Компилируемая программа
+            int_operands: Для каждого значения на стеке программы - известно ли
+                при компиляции, что оно целое
+            operator_token: Оператор со стека операторов
+            argument: Аргумент инструкции (слот переменной для '=')
+        """
+        opcode = OPERATOR_OPCODES.get(operator_token)
+        if opcode is None or opcode == OP_NEG or opcode == OP_STORE_VAR:
+            if opcode is not None:
+                program.append((opcode, argument))
+            return
+
+        right_is_int = int_operands.pop()
+        both_int = int_operands[-1] and right_is_int
+
+        if opcode in INT_OPCODES:
+            # Без ошибки // и % возвращают только целые числа
+            if both_int:
+                opcode = INT_OPCODES[opcode]
+            int_operands[-1] = True
+        else:
+            int_operands[-1] = both_int and opcode != OP_DIV and opcode != OP_POW
 
-        Returns:
-            Числовое значение токена
+        program.append((opcode, argument))
 
-        Raises:
-            ValueError: Если токен не может быть преобразован в число
+    def _unwind_operators(self, program: List[Instruction], int_operands: List[bool],
+                          operators: List[Tuple[str, Any]]) -> None:
         """
-        if not isinstance(token, str):
-            raise ValueError(ERROR_MESSAGES['invalid_number'].format(token))
+        Переносит операторы в программу до ближайшей открывающей скобки.
 
-        try:
-            if '.' in token:
-                return float(token)
-            else:
-                return int(token)
-        except ValueError:
-            raise ValueError(ERROR_MESSAGES['invalid_number'].format(token))
-
-    def handle_primary_expression(self) -> Union[int, float]:
-        """
-        Обрабатывает первичные выражения: числа, переменные, скобки, вызовы функций.
-        
-        Returns:
-            Union[int, float]: Результат вычисления первичного выражения
-            
-        Raises:
-            ValueError: При синтаксических ошибках в выражении
+        Args:
+            program: Компилируемая программа
+            int_operands: Признаки целочисленности значений на стеке программы
+            operators: Стек операторов
         """
-        token = self.get_current_token()
-        
-        if token is None:
-            raise ValueError("Ожидалось число, переменная, функция или скобка")
-        
-        if token == '(':
-            self.consume_token('(')
-            result = self.handle_expression()
-            self.consume_token(')')
-            return result
-        
-        # ИСПРАВЛЕНИЕ: Вызов статических методов через класс, а не через экземпляр
-        elif Tokenizer.is_digit_token(token):  # Было: self._tokenizer.is_digit_token(token)
-            number_token = self.consume_token()
-            return self.parse_number(number_token)
-        
-        # ИСПРАВЛЕНИЕ: Тоже для is_identifier
-        elif Tokenizer.is_identifier(token):  # Было: self._tokenizer.is_identifier(token)
-            identifier = self.consume_token()
-            next_token = self.get_current_token()
-            
-            if next_token == '(':
-                return self.handle_function_call(identifier)
-            else:
-                return self.handle_variable_reference(identifier)
-        
-        else:
-            raise ValueError(f"Ожидалось число, переменная или '(', но получен '{token}'")
+        while operators and operators[-1][0] not in ('(', 'call'):
+            self._emit_operator(program, int_operands, *operators.pop())
 
-    def handle_function_call(self, function_name: str) -> Union[int, float]:
+    def _compile(self, tokens: List[Token]) -> CompiledProgram:
         """
-        Обрабатывает вызов функции.
+        Компилирует токены в программу в обратной польской записи
+        алгоритмом сортировочной станции.
 
         Args:
-            function_name: Имя вызываемой функции
+            tokens: Токены выражения в виде пар (вид, значение)
 
         Returns:
-            Результат вызова функции
+            Скомпилированная программа
 
         Raises:
-            ValueError: Если функция неизвестна или ошибка в аргументах
+            ValueError: При синтаксических ошибках в выражении
         """
-        if function_name not in self._functions:
-            raise ValueError(
-                ERROR_MESSAGES['unknown_function'].format(function_name)
-            )
+        # Позиция и токены хранятся в локальных переменных: в цикле
+        # нет обращений к атрибутам и вызовов методов на каждый токен
+        n = len(tokens)
+        i = 0
 
-        self.consume_token('(')
+        program: List[Instruction] = []
+        int_operands: List[bool] = []
+        # Элементы стека: (оператор, аргумент); '(' и 'call' - открытые скобки
+        operators: List[Tuple[str, Any]] = []
+        argument_counts: List[int] = []
+        expect_operand = True
+        expression_start = True
 
-        arguments = []
-        if self.get_current_token() != ')':
-            arguments.append(self.handle_expression())
+        while True:
+            token = tokens[i] if i < n else None
+
+            if expect_operand:
+                if token is None:
+                    raise ValueError("Ожидалось число, переменная, функция или скобка")
+
+                kind, value = token
+
+                if kind == TK_IDENT and value == 'let' and expression_start:
+                    variable_token = tokens[i + 1] if i + 1 < n else None
+                    if variable_token is None or variable_token[0] != TK_IDENT:
+                        variable_name = variable_token and variable_token[1]
+                        raise ValueError(
+                            f"Ожидалось имя переменной, но получен: {variable_name}"
+                        )
+
+                    assign_token = tokens[i + 2] if i + 2 < n else None
+                    if assign_token is None or assign_token[0] != TK_ASSIGN:
+                        raise self._unexpected_token('=', assign_token)
+
+                    i += 3
+                    operators.append(('=', self._variable_slot(variable_token[1])))
+                    continue
+
+                i += 1
+                expression_start = False
+
+                if kind == TK_LPAREN:
+                    operators.append(('(', None))
+                    expression_start = True
+
+                elif kind == TK_OP_ADD or kind == TK_OP_SUB:
+                    operators.append(('u' + value, None))
+
+                elif kind == TK_NUM:
+                    program.append((OP_PUSH_CONST, value))
+                    int_operands.append(type(value) is int)
+                    expect_operand = False
+
+                elif kind == TK_IDENT:
+                    if i >= n or tokens[i][0] != TK_LPAREN:
+                        program.append((OP_LOAD_VAR, self._variable_slot(value)))
+                        int_operands.append(False)
+                        expect_operand = False
+                        continue
+
+                    function_index = self._function_index.get(value)
+                    if function_index is None:
+                        raise ValueError(f"Неизвестная функция: {value}")
+
+                    i += 1
+                    if i < n and tokens[i][0] == TK_RPAREN:
+                        i += 1
+                        program.append((OP_CALL, (function_index, 0)))
+                        int_operands.append(False)
+                        expect_operand = False
+                    else:
+                        operators.append(('call', function_index))
+                        argument_counts.append(1)
+                        expression_start = True
 
-            while self.get_current_token() == ',':
-                self.consume_token(',')
-                arguments.append(self.handle_expression())
+                else:
+                    raise ValueError(f"Ожидалось число, переменная или '(', но получен '{value}'")
 
-        self.consume_token(')')
+            elif token is None:
+                self._unwind_operators(program, int_operands, operators)
+                if operators:
+                    raise ValueError(ERROR_MESSAGES['unexpected_end'])
+                return self._fold_constants(program)
 
-        try:
-            return self._functions[function_name](*arguments)
-        except Exception as error:
-            raise ValueError(f"Ошибка вызова функции {function_name}: {str(error)}")
+            else:
+                kind, value = token
+
+                if TK_OP_ADD <= kind <= TK_OP_POW:
+                    precedence = OPERATOR_PRECEDENCE[value]
+                    while operators:
+                        top_precedence = OPERATOR_PRECEDENCE.get(operators[-1][0])
+                        if (top_precedence is None or top_precedence < precedence
+                                or (top_precedence == precedence
+                                    and value in RIGHT_ASSOCIATIVE_OPERATORS)):
+                            break
+                        self._emit_operator(program, int_operands, *operators.pop())
+
+                    i += 1
+                    operators.append((value, None))
+                    expect_operand = True
+
+                elif kind == TK_RPAREN or kind == TK_COMMA:
+                    self._unwind_operators(program, int_operands, operators)
+                    if not operators:
+                        raise ValueError(ERROR_MESSAGES['unprocessed_tokens'])
+
+                    bracket, function_index = operators[-1]
+                    i += 1
+                    if kind == TK_COMMA:
+                        if bracket != 'call':
+                            raise self._unexpected_token(')', token)
+                        argument_counts[-1] += 1
+                        expect_operand = True
+                        expression_start = True
+                    else:
+                        operators.pop()
+                        if bracket == 'call':
+                            argument_count = argument_counts.pop()
+                            program.append((OP_CALL, (function_index, argument_count)))
+                            del int_operands[len(int_operands) - argument_count:]
+                            int_operands.append(False)
+
+                elif any(bracket in ('(', 'call') for bracket, _ in operators):
+                    raise self._unexpected_token(')', token)
+
+                else:
+                    raise ValueError(ERROR_MESSAGES['unprocessed_tokens'])
 
-    def handle_variable_reference(self, variable_name: str) -> Union[int, float]:
+    def _fold_constants(self, instructions: List[Instruction]) -> CompiledProgram:
         """
-        Обрабатывает ссылку на переменную.
+        Заменяет программу без переменных и функций на ее результат.
 
         Args:
-            variable_name: Имя переменной
+            instructions: Список инструкций (код операции, аргумент)
 
         Returns:
-            Значение переменной
+            Программа из одной инструкции OP_PUSH_CONST или исходная программа
 
         Raises:
-            ValueError: Если переменная не объявлена
+            ValueError: При ошибках вычисления константного выражения
         """
-        if variable_name not in self._variables:
-            raise ValueError(
-                ERROR_MESSAGES['unknown_variable'].format(variable_name)
-            )
-        return self._variables[variable_name]
+        program = CompiledProgram(instructions)
+        if len(instructions) == 1 or any(opcode not in PURE_OPCODES for opcode in program.ops):
+            return program
+        return CompiledProgram([(OP_PUSH_CONST, self._execute(program))])
 
-    def handle_unary_expression(self) -> Union[int, float]:
+    def _codegen(self, program: CompiledProgram) -> Optional[GeneratedFunction]:
         """
-        Обрабатывает унарные выражения (+ и -).
+        Генерирует и компилирует Python-функцию, вычисляющую программу
+        одним выражением.
 
-        Returns:
-            Результат унарного выражения
-        """
-        token = self.get_current_token()
+        Функция принимает список значений переменных и кортеж функций
+        и возвращает _UNSET, если какая-либо переменная не задана.
 
-        if token in ('+', '-'):
-            self.consume_token()
-            operand = self.handle_unary_expression()
+        Args:
+            program: Скомпилированная программа
 
-            if token == '+':
-                return operand
+        Returns:
+            Функция или None, если программу нужно выполнять интерпретатором
+            (присваивание, // и % без известных типов, константы, слишком
+            глубокая вложенность)
+        """
+        if len(program.ops) == 1:
+            return None
+
+        expressions: List[str] = []
+        # Глубина вложенности скобок каждого выражения: парсер Python
+        # ограничивает ее, а интерпретатор программы - нет
+        depths: List[int] = []
+        slots: List[int] = []
+
+        for opcode, argument in zip(program.ops, program.args):
+            if opcode in _OPCODE_SYMBOLS:
+                right_expression = expressions.pop()
+                expressions[-1] = (
+                    f"({expressions[-1]} {_OPCODE_SYMBOLS[opcode]} {right_expression})"
+                )
+                right_depth = depths.pop()
+                depths[-1] = max(depths[-1], right_depth) + 1
+            elif opcode == OP_PUSH_CONST:
+                if isinstance(argument, float) and not math.isfinite(argument):
+                    return None
+                expressions.append(repr(argument))
+                depths.append(0)
+            elif opcode == OP_LOAD_VAR:
+                if argument not in slots:
+                    slots.append(argument)
+                expressions.append(f"V[{argument}]")
+                depths.append(0)
+            elif opcode == OP_NEG:
+                expressions[-1] = f"(-{expressions[-1]})"
+                depths[-1] += 1
+            elif opcode == OP_CALL:
+                function_index, argument_count = argument
+                split = len(expressions) - argument_count
+                arguments = ', '.join(expressions[split:])
+                del expressions[split:]
+                expressions.append(f"F[{function_index}]({arguments})")
+                depth = max(depths[split:], default=0) + 1
+                del depths[split:]
+                depths.append(depth)
             else:
-                return -operand
-        else:
-            return self.handle_primary_expression()
+                return None
 
-    def handle_power_expression(self) -> Union[int, float]:
-        """
-        Обрабатывает возведение в степень (**).
+            if depths[-1] > CODEGEN_MAX_DEPTH:
+                return None
 
-        Returns:
-            Результат выражения со степенями
-        """
-        left_operand = self.handle_unary_expression()
+        source = "def _f(V, F, _UNSET=_UNSET):\n"
+        if slots:
+            checks = ' or '.join(f"V[{slot}] is _UNSET" for slot in slots)
+            source += f"    if {checks}:\n        return _UNSET\n"
+        source += f"    return {expressions[-1]}\n"
 
-        token = self.get_current_token()
-        if token == '**':
-            self.consume_token('**')
-            right_operand = self.handle_power_expression()
-            return left_operand ** right_operand
+        namespace: Dict[str, Any] = {'_UNSET': _UNSET}
+        try:
+            exec(compile(source, "<calculator>", "exec"), namespace)
+        except (SyntaxError, RecursionError, MemoryError):
+            return None
 
-        return left_operand
+        function: GeneratedFunction = namespace['_f']
+        return function
 
-    def handle_multiplicative_expression(self) -> Union[int, float]:
+    def _execute(self, program: CompiledProgram) -> Number:
         """
-        Обрабатывает мультипликативные выражения (*, /, //, %).
+        Выполняет скомпилированную программу на стеке значений.
+
+        Args:
+            program: Скомпилированная программа
 
         Returns:
-            Результат мультипликативного выражения
+            Результат вычисления
 
         Raises:
-            ValueError: При делении на ноль
-        """
-        result = self.handle_power_expression()
-
-        while True:
-            token = self.get_current_token()
-            if token in ('*', '/', '//', '%'):
-                self.consume_token()
-                right_operand = self.handle_power_expression()
-
-                if token == '*':
-                    result *= right_operand
-                elif token == '/':
-                    if right_operand == 0:
-                        raise ValueError(ERROR_MESSAGES['division_by_zero'])
-                    result /= right_operand
-                elif token == '//':
-                    if right_operand == 0:
-                        raise ValueError(ERROR_MESSAGES['integer_division_by_zero'])
-                    if isinstance(result, int) and isinstance(right_operand, int):
-                        result //= right_operand
-                    else:
-                        raise ValueError("Операция // допустима только для целых чисел")
-                elif token == '%':
+            ValueError: При ошибках вычисления
+        """
+        # Стек выделяется заранее; sp - число значений на стеке
+        stack: List[Number] = [0] * program.max_stack
+        sp = 0
+        binary_operations = _BINARY_OPERATIONS
+        function_table = self._function_table
+        variable_values = self._variable_values
+
+        for opcode, argument in zip(program.ops, program.args):
+            if opcode <= OP_MOD_CHECKED:
+                sp -= 1
+                right_operand = stack[sp]
+                left_operand = stack[sp - 1]
+
+                if opcode >= OP_FLOORDIV_CHECKED and not (
+                        isinstance(left_operand, int) and isinstance(right_operand, int)):
                     if right_operand == 0:
-                        raise ValueError(ERROR_MESSAGES['modulo_by_zero'])
-                    if isinstance(result, int) and isinstance(right_operand, int):
-                        result %= right_operand
+                        raise ValueError(_ZERO_DIVISION_ERRORS[opcode])
+                    raise ValueError(_INTEGER_ONLY_ERRORS[opcode])
+
+                try:
+                    stack[sp - 1] = binary_operations[opcode](left_operand, right_operand)
+                except ZeroDivisionError:
+                    raise ValueError(_ZERO_DIVISION_ERRORS[opcode])
+
+            elif opcode == OP_PUSH_CONST:
+                stack[sp] = argument
+                sp += 1
+
+            elif opcode == OP_LOAD_VAR:
+                value = variable_values[argument]
+                if value is _UNSET:
+                    raise ValueError(
+                        f"Неизвестная переменная: {self._variable_names[argument]}"
+                    )
+                stack[sp] = value
+                sp += 1
+
+            elif opcode == OP_NEG:
+                stack[sp - 1] = -stack[sp - 1]
+
+            elif opcode == OP_STORE_VAR:
+                variable_values[argument] = stack[sp - 1]
+                self._variables[self._variable_names[argument]] = stack[sp - 1]
+
+            elif opcode == OP_CALL:
+                function_index, argument_count = argument
+                function = function_table[function_index]
+                try:
+                    if argument_count == 1:
+                        stack[sp - 1] = function(stack[sp - 1])
+                    elif argument_count == 2:
+                        sp -= 1
+                        stack[sp - 1] = function(stack[sp - 1], stack[sp])
                     else:
-                        raise ValueError("Операция % допустима только для целых чисел")
-            else:
-                break
+                        split = sp - argument_count
+                        stack[split] = function(*stack[split:sp])
+                        sp = split + 1
+                except Exception as error:
+                    function_name = self._function_names[function_index]
+                    raise ValueError(f"Ошибка вызова функции {function_name}: {str(error)}")
 
-        return result
+        return stack[0]
 
-    def handle_additive_expression(self) -> Union[int, float]:
-        """
-        Обрабатывает аддитивные выражения (+, -).
-
-        Returns:
-            Результат аддитивного выражения
-        """
-        result = self.handle_multiplicative_expression()
-
-        while True:
-            token = self.get_current_token()
-            if token in ('+', '-'):
-                self.consume_token()
-                right_operand = self.handle_multiplicative_expression()
-
-                if token == '+':
-                    result += right_operand
-                else:
-                    result -= right_operand
-            else:
-                break
-
-        return result
-
-    def handle_assignment(self) -> Union[int, float]:
-        """
-        Обрабатывает присваивание переменных (let x = выражение).
-
-        Returns:
-            Значение присваивания
-
-        Raises:
-            ValueError: При ошибках в синтаксисе присваивания
-        """
-        token = self.get_current_token()
-
-        if token == 'let':
-            self.consume_token('let')
-
-            variable_name = self.get_current_token()
-            if not self._tokenizer.is_identifier(variable_name):
-                raise ValueError(
-                    ERROR_MESSAGES['invalid_identifier'].format(variable_name)
-                )
-
-            self.consume_token()
-            self.consume_token('=')
-
-            value = self.handle_expression()
-            self._variables[variable_name] = value
-            return value
-
-        else:
-            return self.handle_additive_expression()
-
-    def handle_expression(self) -> Union[int, float]:
-        """
-        Обрабатывает полное выражение.
-
-        Returns:
-            Результат вычисления выражения
-        """
-        return self.handle_assignment()
-
-    def calculate(self, expression: str) -> Union[int, float]:
+    def calculate(self, expression: str) -> Number:
         """
         Вычисляет математическое выражение.
 
@@ -366,27 +599,54 @@ class Calculator:
         if not expression.strip():
             raise ValueError(ERROR_MESSAGES['empty_expression'])
 
-        # Токенизация выражения
-        self._tokens = self._tokenizer.tokenize(expression)
-        self._current_position = 0
+        # Программа ссылается на слоты переменных, а не на их значения,
+        # поэтому кэш остается корректным при любых значениях переменных
+        program = self._program_cache.get(expression)
+        if program is None:
+            if len(self._variable_names) - len(self._variables) > UNASSIGNED_SLOTS_LIMIT:
+                self.clear_cache()
+
+            tokens = self._tokenizer.tokenize_tagged(expression)
+            # Слоты из выражения с ошибкой не нужны ни одной программе
+            slot_count = len(self._variable_names)
+            try:
+                program = self._compile(tokens)
+            except Exception:
+                self._release_slots(slot_count)
+                raise
+
+            self._program_cache[expression] = program
+            if len(self._program_cache) > PROGRAM_CACHE_SIZE:
+                self._program_cache.popitem(last=False)
+        else:
+            self._program_cache.move_to_end(expression)
 
-        # Рекурсивный разбор
-        result = self.handle_expression()
+        program.evaluations += 1
+        if program.evaluations == CODEGEN_MIN_EVALUATIONS:
+            program.function = self._codegen(program)
 
-        # Проверка, что все токены обработаны
-        if self._current_position != len(self._tokens):
-            raise ValueError(ERROR_MESSAGES['unprocessed_tokens'])
+        function = program.function
+        if function is not None:
+            # При любой ошибке программа повторно выполняется интерпретатором,
+            # который сообщает об ошибке так же, как без генерации кода
+            result: Number
+            try:
+                result = function(self._variable_values, self._function_table)
+            except Exception:
+                result = _UNSET
+            if result is not _UNSET:
+                return result
 
-        return result
+        return self._execute(program)
 
-    def get_variables(self) -> Dict[str, Union[int, float]]:
+    def get_variables(self) -> Mapping[str, Number]:
         """
         Возвращает словарь всех объявленных переменных.
 
         Returns:
-            Копия словаря переменных
+            Представление словаря переменных только для чтения
         """
-        return self._variables.copy()
+        return MappingProxyType(self._variables)
 
     def get_available_functions(self) -> List[str]:
         """
@@ -399,9 +659,22 @@ class Calculator:
 
     def clear_variables(self) -> None:
         """Очищает все объявленные переменные."""
+        # Слоты сохраняются, чтобы закэшированные программы оставались верными
+        self._variable_values[:] = [_UNSET] * len(self._variable_values)
         self._variables.clear()
 
-    def get_variable_value(self, variable_name: str) -> Optional[Union[int, float]]:
+    def clear_cache(self) -> None:
+        """Очищает кэш скомпилированных выражений."""
+        self._program_cache.clear()
+
+        # Без закэшированных программ слоты нужны только присвоенным переменным
+        self._variable_names[:] = self._variables
+        self._variable_values[:] = self._variables.values()
+        self._variable_index = {
+            name: slot for slot, name in enumerate(self._variable_names)
+        }
+
+    def get_variable_value(self, variable_name: str) -> Optional[Number]:
         """
         Возвращает значение переменной.
 
@@ -5,26 +5,95 @@
 # Регулярные выражения для токенизации
 TOKEN_PATTERN: str = r'(\d+\.?\d*|\*\*|//|[+\-*/%=(),]|[a-zA-Z_][a-zA-Z0-9_]*)'
 
-# Приоритеты операторов
+# Виды токенов
+TK_NUM = 0
+TK_OP_ADD = 1
+TK_OP_SUB = 2
+TK_OP_MUL = 3
+TK_OP_DIV = 4
+TK_OP_FLOORDIV = 5
+TK_OP_MOD = 6
+TK_OP_POW = 7
+TK_IDENT = 9
+TK_LPAREN = 10
+TK_RPAREN = 11
+TK_COMMA = 12
+TK_ASSIGN = 13
+
+# Максимальное число скомпилированных выражений в кэше калькулятора
+PROGRAM_CACHE_SIZE: int = 256
+
+# Максимальное число слотов переменных без значения; при превышении кэш
+# программ очищается, и слоты остаются только у присвоенных переменных
+UNASSIGNED_SLOTS_LIMIT: int = 1024
+
+# Число вычислений выражения, после которого для него генерируется
+# Python-код: компиляция кода дороже однократного вычисления
+CODEGEN_MIN_EVALUATIONS: int = 2
+
+# Максимальная вложенность выражения, для которого генерируется Python-код;
+# более глубокие выражения выполняются интерпретатором программы
+CODEGEN_MAX_DEPTH: int = 100
+
+# Приоритеты операторов ('u+' и 'u-' - унарные плюс и минус)
 OPERATOR_PRECEDENCE = {
+    'u+': 5, 'u-': 5,
     '**': 4,
     '*': 3, '/': 3, '//': 3, '%': 3,
     '+': 2, '-': 2,
     '=': 1
 }
 
+# Правоассоциативные операторы
+RIGHT_ASSOCIATIVE_OPERATORS = frozenset({'**', 'u+', 'u-', '='})
+
+# Коды операций скомпилированной программы
+OP_ADD = 0
+OP_SUB = 1
+OP_MUL = 2
+OP_DIV = 3
+OP_FLOORDIV_INT = 4
+OP_MOD_INT = 5
+OP_POW = 6
+OP_FLOORDIV_CHECKED = 7
+OP_MOD_CHECKED = 8
+OP_NEG = 9
+OP_PUSH_CONST = 10
+OP_LOAD_VAR = 11
+OP_STORE_VAR = 12
+OP_CALL = 13
+
+# Варианты // и % для операндов, целочисленность которых известна
+# при компиляции: проверка типов во время выполнения не нужна
+INT_OPCODES = {
+    OP_FLOORDIV_CHECKED: OP_FLOORDIV_INT,
+    OP_MOD_CHECKED: OP_MOD_INT
+}
+
+# Операции, не зависящие от переменных и функций: программа только из них
+# вычисляется один раз при компиляции
+PURE_OPCODES = frozenset({
+    OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_FLOORDIV_INT, OP_MOD_INT, OP_POW,
+    OP_FLOORDIV_CHECKED, OP_MOD_CHECKED, OP_NEG, OP_PUSH_CONST
+})
+
+# Соответствие операторов кодам операций (унарный плюс не порождает кода)
+OPERATOR_OPCODES = {
+    '+': OP_ADD, '-': OP_SUB,
+    '*': OP_MUL, '/': OP_DIV, '//': OP_FLOORDIV_CHECKED, '%': OP_MOD_CHECKED,
+    '**': OP_POW,
+    'u-': OP_NEG,
+    '=': OP_STORE_VAR
+}
+
 # Сообщения об ошибках
 ERROR_MESSAGES = {
     'empty_expression': "Пустое выражение",
     'invalid_expression': "Выражение должно быть строкой",
+    'invalid_number': "Некорректное число: {}",
     'division_by_zero': "Деление на ноль",
     'integer_division_by_zero': "Целочисленное деление на ноль",
     'modulo_by_zero': "Деление по модулю на ноль",
-    'unknown_variable': "Неизвестная переменная: {}",
-    'unknown_function': "Неизвестная функция: {}",
     'unexpected_end': "Неожиданный конец выражения",
-    'unexpected_token': "Ожидался '{}', но получен '{}'",
-    'invalid_number': "Некорректное число: {}",
-    'invalid_identifier': "Ожидалось имя переменной, но получен: {}",
     'unprocessed_tokens': "Некорректное выражение: необработанные токены"
 }
\ No newline at end of file
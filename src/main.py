@@ -2,55 +2,82 @@
 Главный модуль для запуска калькулятора.
 """
 
+import sys
+from typing import Iterable
+
 from calculator import Calculator
 
+
+def process_input(calculator: Calculator, user_input: str) -> bool:
+    """
+    Выполняет одну команду или выражение и печатает результат.
+
+    Args:
+        calculator: Калькулятор
+        user_input: Строка ввода без пробелов по краям
+
+    Returns:
+        False если введена команда выхода, иначе True
+    """
+    try:
+        if user_input.lower() in ('quit', 'exit', 'q'):
+            print("Выход из программы")
+            return False
+
+        if not user_input:
+            return True
+
+        elif user_input == 'vars':
+            variables = calculator.get_variables()
+            if variables:
+                print("Переменные:")
+                for name, value in variables.items():
+                    print(f"  {name} = {value}")
+            else:
+                print("Переменные не объявлены")
+            return True
+
+        elif user_input == 'funcs':
+            functions = calculator.get_available_functions()
+            print("Доступные функции:", ', '.join(sorted(functions)))
+            return True
+
+        elif user_input == 'clear':
+            calculator.clear_variables()
+            print("Все переменные очищены")
+            return True
+
+        # Вычисление выражения
+        result = calculator.calculate(user_input)
+        print(f"Результат: {result}")
+
+    except ValueError as error:
+        print(f"Ошибка: {error}")
+    except Exception as error:
+        print(f"Неизвестная ошибка: {error}")
+
+    return True
+
+
 def main() -> None:
     """Главная функция для интерактивного режима калькулятора."""
     calculator = Calculator()
 
-    while True:
-        try:
-            user_input = input(">>> ").strip()
+    # Из канала строки читаются пакетно и без приглашения, повторяющиеся
+    # выражения при этом берутся из кэша калькулятора
+    lines: Iterable[str]
+    if sys.stdin.isatty():
+        lines = iter(lambda: input(">>> "), None)
+    else:
+        lines = sys.stdin
 
-            if user_input.lower() in ('quit', 'exit', 'q'):
-                print("Выход из программы")
+    try:
+        for line in lines:
+            if not process_input(calculator, line.strip()):
                 break
-
-            if not user_input:
-                continue
-
-            elif user_input == 'vars':
-                variables = calculator.get_variables()
-                if variables:
-                    print("Переменные:")
-                    for name, value in variables.items():
-                        print(f"  {name} = {value}")
-                else:
-                    print("Переменные не объявлены")
-                continue
-
-            elif user_input == 'funcs':
-                functions = calculator.get_available_functions()
-                print("Доступные функции:", ', '.join(sorted(functions)))
-                continue
-
-            elif user_input == 'clear':
-                calculator.clear_variables()
-                print("Все переменные очищены")
-                continue
-
-            # Вычисление выражения
-            result = calculator.calculate(user_input)
-            print(f"Результат: {result}")
-
-        except ValueError as error:
-            print(f"Ошибка: {error}")
-        except KeyboardInterrupt:
-            print("\nВыход из программы")
-            break
-        except Exception as error:
-            print(f"Неизвестная ошибка: {error}")
+    except (KeyboardInterrupt, EOFError):
+        print("\nВыход из программы")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -3,8 +3,39 @@
 """
 
 import re
-from typing import List
-from constants import TOKEN_PATTERN
+import sys
+from typing import Any, List, Tuple
+from constants import (
+    ERROR_MESSAGES,
+    TK_ASSIGN,
+    TK_COMMA,
+    TK_IDENT,
+    TK_LPAREN,
+    TK_NUM,
+    TK_OP_ADD,
+    TK_OP_DIV,
+    TK_OP_FLOORDIV,
+    TK_OP_MOD,
+    TK_OP_MUL,
+    TK_OP_POW,
+    TK_OP_SUB,
+    TK_RPAREN,
+    TOKEN_PATTERN
+)
+
+# Скомпилированное выражение токенов; пробелы перед токеном поглощаются
+_TOKEN_RE = re.compile(r'\s*' + TOKEN_PATTERN)
+
+# Размеченный токен: (вид, значение)
+Token = Tuple[int, Any]
+
+# Виды токенов операторов и разделителей
+_OP_KIND = {
+    '+': TK_OP_ADD, '-': TK_OP_SUB,
+    '*': TK_OP_MUL, '/': TK_OP_DIV, '//': TK_OP_FLOORDIV, '%': TK_OP_MOD,
+    '**': TK_OP_POW,
+    '(': TK_LPAREN, ')': TK_RPAREN, ',': TK_COMMA, '=': TK_ASSIGN
+}
 
 
 class Tokenizer:
@@ -14,7 +45,7 @@ class Tokenizer:
 
     def __init__(self) -> None:
         """Инициализация токенизатора."""
-        self._token_pattern = TOKEN_PATTERN
+        self._token_re: re.Pattern[str] = _TOKEN_RE
 
     def tokenize(self, expression: str) -> List[str]:
         """
@@ -32,17 +63,53 @@ class Tokenizer:
         if not isinstance(expression, str):
             raise ValueError("Выражение должно быть строкой")
 
-        expression = expression.strip()
+        # Пробелы пропускаются самим регулярным выражением, поэтому строка
+        # просматривается один раз; strip нужен только при отсутствии токенов
+        tokens = self._token_re.findall(expression)
 
-        if not expression:
+        if not tokens and not expression.strip():
             raise ValueError("Пустое выражение")
 
-        # Удаляем пробелы и токенизируем
-        expression = expression.replace(' ', '')
-        tokens = re.findall(self._token_pattern, expression)
+        # Короткие токены (все операторы и скобки) интернируются, чтобы
+        # сравнения и поиск в словарях сводились к сравнению указателей
+        return [sys.intern(token) if len(token) <= 2 else token for token in tokens]
 
-        return tokens
+    def tokenize_tagged(self, expression: str) -> List[Token]:
+        """
+        Разбивает выражение на токены с указанием их вида.
+
+        Числа сразу преобразуются в int или float, поэтому при разборе
+        строки чисел повторно не обрабатываются; остальные токены
+        сохраняются как строки.
+
+        Args:
+            expression: Математическое выражение для токенизации
 
+        Returns:
+            Список пар (вид токена, значение)
+
+        Raises:
+            ValueError: Если выражение пустое, не является строкой
+                или содержит некорректное число
+        """
+        tagged_tokens: List[Token] = []
+
+        for token in self.tokenize(expression):
+            kind = _OP_KIND.get(token)
+            if kind is not None:
+                tagged_tokens.append((kind, token))
+            elif token[0].isdigit():
+                try:
+                    number = int(token) if token.isdigit() else float(token)
+                except ValueError:
+                    raise ValueError(ERROR_MESSAGES['invalid_number'].format(token))
+                tagged_tokens.append((TK_NUM, number))
+            else:
+                tagged_tokens.append((TK_IDENT, token))
+
+        return tagged_tokens
+
+    @staticmethod
     def is_digit_token(token: str) -> bool:
         """
         Проверяет, является ли токен числом.
@@ -55,8 +122,9 @@ class Tokenizer:
         """
         if not isinstance(token, str):
             return False
-        return token.replace('.', '').isdigit()
+        return token[:1].isdigit() and token.replace('.', '', 1).isdigit()
 
+    @staticmethod
     def is_identifier(token: str) -> bool:
         """
         Проверяет, является ли токен идентификатором.
@@ -67,6 +135,4 @@ class Tokenizer:
         Returns:
             True если токен является идентификатором, иначе False
         """
-        if not isinstance(token, str):
-            return False
-        return bool(re.fullmatch(r'[a-zA-Z_][a-zA-Z0-9_]*', token))
\ No newline at end of file
+        return isinstance(token, str) and token.isidentifier() and token.isascii()
\ No newline at end of file
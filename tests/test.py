@@ -12,6 +12,11 @@ from typing import Any
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from calculator import Calculator
+from constants import (
+    OP_PUSH_CONST, PROGRAM_CACHE_SIZE, TK_IDENT, TK_LPAREN, TK_NUM, TK_OP_POW, TK_RPAREN,
+    UNASSIGNED_SLOTS_LIMIT
+)
+from tokenizer import Tokenizer
 
 
 class TestCalculatorBasic(unittest.TestCase):
@@ -51,6 +56,8 @@ class TestCalculatorBasic(unittest.TestCase):
             ("2 ** 3", 8),
             ("3 ** 2", 9),
             ("(2 ** 3) ** 2", 64),
+            ("2 ** 3 ** 2", 512),
+            ("2 ** -1", 0.5),
         ]
         
         for expression, expected in test_cases:
@@ -58,6 +65,39 @@ class TestCalculatorBasic(unittest.TestCase):
                 result: Any = self.calculator.calculate(expression)
                 self.assertEqual(result, expected)
     
+    def test_integer_division_and_modulo(self) -> None:
+        """
+        Тестирует операции // и % с целыми и вещественными операндами.
+        """
+        self.calculator.calculate("let x = 4")
+        test_cases = [
+            ("(2 + 3) * 4 // 3", 6),
+            ("17 % 5 * 2", 4),
+            ("(2 + 3) * 4 // 3 + x", 10),
+            ("x * 5 // 3 % x", 2),
+        ]
+        
+        for expression, expected in test_cases:
+            with self.subTest(expression=expression):
+                result: Any = self.calculator.calculate(expression)
+                self.assertEqual(result, expected)
+        
+        for expression in ("7.5 // 2", "x / 2 // 1", "x % 0",
+                           "(-1) ** 0.5 // 1", "10 ** 400 % 1.5"):
+            with self.subTest(expression=expression):
+                with self.assertRaises(ValueError):
+                    self.calculator.calculate(expression)
+    
+    def test_long_power_and_unary_chains(self) -> None:
+        """
+        Тестирует длинные цепочки ** и унарных операторов без переполнения стека вызовов.
+        """
+        depth = sys.getrecursionlimit() * 5
+        self.assertEqual(self.calculator.calculate(" ** ".join(["1"] * depth)), 1)
+        self.assertEqual(self.calculator.calculate("2 ** " + "1 ** " * depth + "3"), 2)
+        self.assertEqual(self.calculator.calculate("-" * (depth + 1) + "2"), -2)
+        self.assertEqual(self.calculator.calculate("+-" * depth + "2 ** 2"), 4)
+    
     def test_division_by_zero_raises_error(self) -> None:
         """
         Тестирует обработку деления на ноль.
@@ -77,12 +117,53 @@ class TestCalculatorVariables(unittest.TestCase):
         """
         self.calculator = Calculator()
     
+    def test_variable_assignment(self) -> None:
+        """
+        Тестирует объявление и использование переменных.
+        """
+        self.assertEqual(self.calculator.calculate("let x = 5"), 5)
+        self.assertEqual(self.calculator.calculate("let y = x * 2"), 10)
+        self.assertEqual(self.calculator.calculate("x + y"), 15)
+        self.assertEqual(self.calculator.get_variables(), {'x': 5, 'y': 10})
+        with self.assertRaises(TypeError):
+            self.calculator.get_variables()['x'] = 0  # type: ignore[index]
+    
+    def test_clear_variables(self) -> None:
+        """
+        Тестирует очистку переменных для уже скомпилированных выражений.
+        """
+        self.calculator.calculate("let x = 5")
+        self.assertEqual(self.calculator.calculate("x + 1"), 6)
+        self.calculator.clear_variables()
+        self.assertIsNone(self.calculator.get_variable_value("x"))
+        self.assertEqual(self.calculator.get_variables(), {})
+        with self.assertRaises(ValueError, msg="Неизвестная переменная"):
+            self.calculator.calculate("x + 1")
+    
     def test_unknown_variable_raises_error(self) -> None:
         """
         Тестирует обработку неизвестной переменной.
         """
         with self.assertRaises(ValueError, msg="Неизвестная переменная"):
             self.calculator.calculate("unknown_var + 5")
+    
+    def test_variable_slots_are_bounded(self) -> None:
+        """
+        Тестирует освобождение слотов переменных без значения.
+        """
+        self.calculator.calculate("let x = 5")
+        with self.assertRaises(ValueError):
+            self.calculator.calculate("typo +")
+        self.assertNotIn("typo", self.calculator._variable_index)
+        
+        for index in range(UNASSIGNED_SLOTS_LIMIT + 10):
+            with self.assertRaises(ValueError):
+                self.calculator.calculate(f"x + unknown_{index}")
+        self.assertLessEqual(len(self.calculator._variable_names), UNASSIGNED_SLOTS_LIMIT + 2)
+        
+        self.calculator.clear_cache()
+        self.assertEqual(self.calculator._variable_names, ['x'])
+        self.assertEqual(self.calculator.calculate("x + 1"), 6)
 
 
 class TestCalculatorFunctions(unittest.TestCase):
@@ -121,5 +202,136 @@ class TestCalculatorFunctions(unittest.TestCase):
             self.calculator.calculate("unknown_func(5)")
 
 
+class TestCalculatorCache(unittest.TestCase):
+    """
+    Тесты кэша скомпилированных выражений.
+    """
+    
+    def setUp(self) -> None:
+        """
+        Подготовка перед каждым тестом.
+        """
+        self.calculator = Calculator()
+    
+    def test_repeated_expression_uses_cache(self) -> None:
+        """
+        Тестирует повторное вычисление закэшированного выражения.
+        """
+        for _ in range(3):
+            self.assertEqual(self.calculator.calculate("(2 + 3) * 4"), 20)
+        self.assertIn("(2 + 3) * 4", self.calculator._program_cache)
+    
+    def test_constant_expression_is_folded(self) -> None:
+        """
+        Тестирует вычисление выражения без переменных на этапе компиляции.
+        """
+        self.assertEqual(self.calculator.calculate("2 * (3 + 4) - -1"), 15)
+        program = self.calculator._program_cache["2 * (3 + 4) - -1"]
+        self.assertEqual(list(program.ops), [OP_PUSH_CONST])
+        self.assertEqual(program.args, [15])
+    
+    def test_generated_function_matches_interpreter(self) -> None:
+        """
+        Тестирует выражения, вычисляемые сгенерированной Python-функцией.
+        """
+        self.calculator.calculate("let x = 9")
+        self.assertEqual(self.calculator.calculate("-x * 2 + sqrt(x) ** 2"), -9.0)
+        program = self.calculator._program_cache["-x * 2 + sqrt(x) ** 2"]
+        self.assertIsNone(program.function)
+        
+        for _ in range(2):
+            self.assertEqual(self.calculator.calculate("-x * 2 + sqrt(x) ** 2"), -9.0)
+            self.assertEqual(self.calculator.calculate("max(x, 10, 3) % 4"), 2)
+        self.assertIsNotNone(program.function)
+        with self.assertRaises(ValueError, msg="Ошибка вызова функции sqrt"):
+            self.calculator.calculate("sqrt(-x) + 1")
+    
+    def test_deeply_nested_expressions(self) -> None:
+        """
+        Тестирует глубоко вложенные выражения с переменными, для которых
+        Python-код не генерируется.
+        """
+        depth = sys.getrecursionlimit() * 5
+        self.calculator.calculate("let x = 2")
+        test_cases = [
+            ("(" * depth + "x" + ")" * depth + " + 1", 3),
+            ("-" * depth + "x", 2 if depth % 2 == 0 else -2),
+            (" + ".join(["x"] * depth), 2 * depth),
+            ("abs(" * depth + "x" + ")" * depth, 2),
+        ]
+        
+        for expression, expected in test_cases * 2:
+            with self.subTest(expression=expression[:20]):
+                self.assertEqual(self.calculator.calculate(expression), expected)
+        self.assertIsNone(self.calculator._program_cache["-" * depth + "x"].function)
+    
+    def test_program_stack_depth(self) -> None:
+        """
+        Тестирует вычисление глубины стека программы при компиляции.
+        """
+        self.assertEqual(self.calculator.calculate("let x = max(1, 2, 3) + 4 * (5 - 6)"), -1)
+        program = self.calculator._program_cache["let x = max(1, 2, 3) + 4 * (5 - 6)"]
+        self.assertEqual(program.max_stack, 4)
+    
+    def test_cached_expression_sees_new_variable_values(self) -> None:
+        """
+        Тестирует, что закэшированное выражение читает текущие значения переменных.
+        """
+        self.calculator.calculate("let x = 2")
+        self.assertEqual(self.calculator.calculate("x * 10"), 20)
+        self.calculator.calculate("let x = 3")
+        self.assertEqual(self.calculator.calculate("x * 10"), 30)
+    
+    def test_cache_size_is_bounded(self) -> None:
+        """
+        Тестирует ограничение размера кэша.
+        """
+        for number in range(PROGRAM_CACHE_SIZE + 10):
+            self.calculator.calculate(f"{number} + 1")
+        self.assertEqual(len(self.calculator._program_cache), PROGRAM_CACHE_SIZE)
+        self.assertNotIn("0 + 1", self.calculator._program_cache)
+
+
+class TestTokenizer(unittest.TestCase):
+    """
+    Тесты токенизатора.
+    """
+    
+    def test_tokenize_tagged(self) -> None:
+        """
+        Тестирует разметку токенов по видам.
+        """
+        tokens = Tokenizer().tokenize_tagged("sqrt(x) ** 2.5 ** 3")
+        self.assertEqual(tokens, [
+            (TK_IDENT, 'sqrt'), (TK_LPAREN, '('), (TK_IDENT, 'x'), (TK_RPAREN, ')'),
+            (TK_OP_POW, '**'), (TK_NUM, 2.5), (TK_OP_POW, '**'), (TK_NUM, 3),
+        ])
+    
+    def test_invalid_number(self) -> None:
+        """
+        Тестирует сообщение о числе, которое нельзя преобразовать.
+        """
+        with self.assertRaisesRegex(ValueError, "^Некорректное число: 1111"):
+            Calculator().calculate("1" * 5000)
+    
+    def test_token_checks(self) -> None:
+        """
+        Тестирует проверку чисел и идентификаторов.
+        """
+        for token in ("0", "42", "3.14", "10."):
+            with self.subTest(token=token):
+                self.assertTrue(Tokenizer.is_digit_token(token))
+        for token in ("", ".5", "1.2.3", "x1", "1e5", "-1", None):
+            with self.subTest(token=token):
+                self.assertFalse(Tokenizer.is_digit_token(token))  # type: ignore[arg-type]
+        
+        for token in ("x", "_tmp", "log10", "Var_2"):
+            with self.subTest(token=token):
+                self.assertTrue(Tokenizer.is_identifier(token))
+        for token in ("", "2x", "имя", "x-y", "+", None):
+            with self.subTest(token=token):
+                self.assertFalse(Tokenizer.is_identifier(token))  # type: ignore[arg-type]
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file